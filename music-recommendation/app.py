@@ -1,17 +1,66 @@
 from flask import Flask, request, jsonify, render_template
+from flask.json.provider import JSONProvider
+import orjson
 import cv2
-import base64
+import binascii
 import numpy as np
-import json
+import logging
 import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from operator import itemgetter
+from functools import lru_cache
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TLRUCache, cached
 # DeepFace may import TensorFlow and take long at startup. Do a lazy import when an image is provided.
 DEEPFACE_AVAILABLE = False  # Will attempt runtime import when needed
+_DEEPFACE = None
+_DEEPFACE_ERROR = None
+# Serializes model construction and inference across worker threads (gunicorn --threads)
+_DEEPFACE_LOCK = threading.RLock()
 import text2emotion as te
 import spotipy
 from spotipy.oauth2 import SpotifyClientCredentials
 import os
+# Optional: pyahocorasick matches all keywords in a single pass over the text
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+# Optional: numba compiles the byte-level keyword scorer used when pyahocorasick is missing
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+# Optional: PyTurboJPEG decodes JPEG frames with libjpeg-turbo's SIMD paths
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    _TURBOJPEG = TurboJPEG()
+except Exception:
+    # Missing package or missing libturbojpeg shared library
+    _TURBOJPEG = None
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson, so jsonify() uses its C encoder."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response instead of round-tripping through str
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY), mimetype="application/json")
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
 # Spotify API credentials (set these as environment variables)
 SPOTIFY_CLIENT_ID = os.getenv('SPOTIFY_CLIENT_ID')
@@ -22,7 +71,50 @@ if SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET:
     sp = spotipy.Spotify(auth_manager=SpotifyClientCredentials(client_id=SPOTIFY_CLIENT_ID, client_secret=SPOTIFY_CLIENT_SECRET))
 else:
     sp = None
-    print("Spotify API credentials not set. Playlist functionality will be disabled.")
+    app.logger.warning("Spotify API credentials not set. Playlist functionality will be disabled.")
+
+# Shared pool so the per-mood Spotify searches run concurrently instead of back to back
+_SPOTIFY_POOL = ThreadPoolExecutor(max_workers=8)
+
+# Spotify search results per mood, kept for an hour (only ~8 distinct moods).
+# Entries are (fetched_at, playlists) and expire an hour after the Spotify fetch,
+# not after insertion, so rows reloaded from SQLite don't get a fresh hour.
+PLAYLIST_CACHE_TTL = 3600
+_PLAYLIST_CACHE = TLRUCache(maxsize=32, ttu=lambda _key, value, _now: value[0] + PLAYLIST_CACHE_TTL, timer=time.time)
+
+# The same results persisted to SQLite so a restart doesn't go back to Spotify for every mood
+PLAYLIST_DB_PATH = os.getenv('PLAYLIST_CACHE_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'playlists.db'))
+
+def _init_playlist_db():
+    try:
+        with closing(sqlite3.connect(PLAYLIST_DB_PATH)) as conn:
+            # WAL lets gunicorn workers read while another one writes
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS playlists (mood TEXT PRIMARY KEY, payload BLOB NOT NULL, ts INTEGER NOT NULL)')
+    except sqlite3.Error as e:
+        app.logger.warning('Playlist cache database unavailable: %s', e)
+
+def _load_stored_playlists(mood):
+    """Return (fetched_at, playlists) for mood from the SQLite cache if unexpired, or None."""
+    try:
+        with closing(sqlite3.connect(PLAYLIST_DB_PATH, timeout=5)) as conn:
+            row = conn.execute('SELECT ts, payload FROM playlists WHERE mood = ? AND ts > ?',
+                               (mood, int(time.time()) - PLAYLIST_CACHE_TTL)).fetchone()
+    except sqlite3.Error as e:
+        app.logger.warning('Could not read playlist cache: %s', e)
+        return None
+    return (row[0], orjson.loads(row[1])) if row else None
+
+def _store_playlists(mood, fetched_at, playlists):
+    try:
+        with closing(sqlite3.connect(PLAYLIST_DB_PATH, timeout=5)) as conn, conn:
+            conn.execute('INSERT OR REPLACE INTO playlists (mood, payload, ts) VALUES (?, ?, ?)',
+                         (mood, orjson.dumps(playlists), fetched_at))
+    except sqlite3.Error as e:
+        app.logger.warning('Could not write playlist cache: %s', e)
+
+if sp is not None:
+    _init_playlist_db()
 
 # Emotion to mood mapping
 emotion_to_mood = {
@@ -42,39 +134,317 @@ emotion_to_mood = {
     'love': 'romantic'
 }
 
+# Keyword score at which keyword matching overrides text2emotion
+DECISIVE_KEYWORD_SCORE = 2
+
+# Devanagari script range; any match means the text is treated as Hindi
+_HINDI_RE = re.compile(r'[\u0900-\u097F]')
+
+# Enhanced keyword-based emotion detection (English + Hindi keywords)
+_EMOTION_KEYWORDS = MappingProxyType({
+    'happy': ('happy', 'joy', 'excited', 'great', 'wonderful', 'amazing', 'fantastic', 'love', 'glad', 'cheerful', 'delighted', 'thrilled', 'excellent', 'good', 'awesome', 'perfect', 'खुश', 'खुशी', 'खुश हूँ', 'मज़ा', 'उत्साहित'),
+    'sad': ('sad', 'unhappy', 'depressed', 'lonely', 'miserable', 'down', 'blue', 'disappointed', 'upset', 'hurt', 'heartbroken', 'crying', 'tears', 'awful', 'terrible', 'bad', 'उदास', 'दुख', 'टूट', 'दुखी'),
+    'angry': ('angry', 'mad', 'furious', 'irritated', 'annoyed', 'frustrated', 'rage', 'pissed', 'hate', 'disgusted', 'outraged', 'गुस्सा', 'क्रोधित', 'नाराज़'),
+    'fear': ('scared', 'afraid', 'fear', 'anxious', 'worried', 'nervous', 'terrified', 'frightened', 'panic', 'डर', 'घबराहट', 'डरा'),
+    'surprise': ('surprised', 'shocked', 'amazed', 'astonished', 'wow', 'incredible', 'unbelievable', 'हैरान', 'चकित'),
+    'neutral': ('okay', 'fine', 'alright', 'normal', 'meh', 'whatever', 'ठीक', 'अच्छा', 'सामान्य')
+})
+
+# Words are runs of \w plus Devanagari letters and vowel signs (which \w alone
+# splits on); the danda sentence marks U+0964/U+0965 are left out.
+_TOKEN_RE = re.compile(r'[\w\u0900-\u0963\u0966-\u097F]+')
+
+# Inverted lookup built once at import: single-word keyword -> emotion.
+# Multi-word keywords (e.g. 'खुश हूँ') can't be found by token lookup and are kept as phrases.
+_KEYWORD_TO_EMOTION = {}
+_PHRASE_TO_EMOTION = {}
+for _emotion, _keywords in _EMOTION_KEYWORDS.items():
+    for _kw in _keywords:
+        if len(_TOKEN_RE.findall(_kw)) == 1:
+            _KEYWORD_TO_EMOTION[_kw] = _emotion
+        else:
+            _PHRASE_TO_EMOTION[_kw] = _emotion
+
+# All phrases in one alternation so the regex engine finds them in a single scan;
+# longest first, and only as whole words
+_PHRASE_RE = re.compile(
+    r'(?<![\w\u0900-\u0963\u0966-\u097F])(?:'
+    + '|'.join(map(re.escape, sorted(_PHRASE_TO_EMOTION, key=len, reverse=True)))
+    + r')(?![\w\u0900-\u0963\u0966-\u097F])'
+) if _PHRASE_TO_EMOTION else None
+
+# Same keywords compiled into an Aho-Corasick automaton when the library is installed
+if AHOCORASICK_AVAILABLE:
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _emotion, _keywords in _EMOTION_KEYWORDS.items():
+        for _kw in _keywords:
+            _KEYWORD_AUTOMATON.add_word(_kw, (_kw, _emotion))
+    _KEYWORD_AUTOMATON.make_automaton()
+
+# Every non-word character becomes a single space, so byte offsets stay aligned and
+# a keyword boundary is simply "start/end of buffer or a space byte"
+_NON_WORD_RE = re.compile(r'[^\w\u0900-\u0963\u0966-\u097F]')
+
+if NUMBA_AVAILABLE:
+    # Keyword table flattened into arrays: UTF-8 bytes, per-keyword offsets and emotion ids
+    _EMOTION_NAMES = list(_EMOTION_KEYWORDS)
+    _keyword_bytes = [_kw.encode('utf-8') for _keywords in _EMOTION_KEYWORDS.values() for _kw in _keywords]
+    _KW_FLAT = np.frombuffer(b''.join(_keyword_bytes), dtype=np.uint8)
+    _KW_OFFSETS = np.cumsum([0] + [len(_b) for _b in _keyword_bytes]).astype(np.int64)
+    _KW_EMOTION_IDS = np.array([_i for _i, _keywords in enumerate(_EMOTION_KEYWORDS.values()) for _kw in _keywords], dtype=np.int32)
+
+    @njit(cache=True)
+    def _score_bytes(text, flat, offsets, emotion_ids, n_emotions):
+        counts = np.zeros(n_emotions, np.int32)
+        n = text.shape[0]
+        for k in range(offsets.shape[0] - 1):
+            start = offsets[k]
+            length = offsets[k + 1] - start
+            for i in range(n - length + 1):
+                if i > 0 and text[i - 1] != 32:
+                    continue
+                end = i + length
+                if end < n and text[end] != 32:
+                    continue
+                j = 0
+                while j < length and text[i + j] == flat[start + j]:
+                    j += 1
+                if j == length:
+                    # Each keyword counts once, however often it appears
+                    counts[emotion_ids[k]] += 1
+                    break
+        return counts
+
+def _score_keywords_numba(text):
+    buf = np.frombuffer(_NON_WORD_RE.sub(' ', text).encode('utf-8'), dtype=np.uint8)
+    counts = _score_bytes(buf, _KW_FLAT, _KW_OFFSETS, _KW_EMOTION_IDS, len(_EMOTION_NAMES))
+    return {_EMOTION_NAMES[i]: int(count) for i, count in enumerate(counts) if count}
+
+def _is_word_char(text, i):
+    return 0 <= i < len(text) and _TOKEN_RE.match(text[i]) is not None
+
+def _score_keywords_automaton(text):
+    # Substring hits inside longer words are dropped so results agree with the token path
+    matched = {}
+    for end, (keyword, emotion_key) in _KEYWORD_AUTOMATON.iter(text):
+        start = end - len(keyword) + 1
+        if not _is_word_char(text, start - 1) and not _is_word_char(text, end + 1):
+            matched[keyword] = emotion_key
+    emotion_scores = {}
+    for emotion_key in matched.values():
+        emotion_scores[emotion_key] = emotion_scores.get(emotion_key, 0) + 1
+    return emotion_scores
+
+def _score_keywords_tokens(text):
+    emotion_scores = {}
+    for token in set(_TOKEN_RE.findall(text)):
+        emotion_key = _KEYWORD_TO_EMOTION.get(token)
+        if emotion_key:
+            emotion_scores[emotion_key] = emotion_scores.get(emotion_key, 0) + 1
+    if _PHRASE_RE is not None:
+        for phrase in set(_PHRASE_RE.findall(text)):
+            emotion_key = _PHRASE_TO_EMOTION[phrase]
+            emotion_scores[emotion_key] = emotion_scores.get(emotion_key, 0) + 1
+    return emotion_scores
+
+def _argmax(scores):
+    # Single pass over items(); max(d, key=d.get) does an extra lookup per key
+    return max(scores.items(), key=itemgetter(1))[0]
+
+@lru_cache(maxsize=1024)
+def _cached_text_emotion(text):
+    # Stored as a tuple so callers can't mutate the cached result; order is kept for tie-breaking.
+    # text2emotion capitalizes its labels ('Happy'); lower-case them once here so every
+    # detection path yields keys that match emotion_to_mood directly.
+    return tuple((emotion_key.lower(), score) for emotion_key, score in te.get_emotion(text).items())
+
+# First get_emotion call loads NLTK data; do it now rather than on the first request
+try:
+    te.get_emotion('warmup')
+except Exception as e:
+    app.logger.warning('text2emotion warmup failed: %s', e)
+
+def score_keywords(text):
+    """Count distinct keyword matches per emotion in lower-cased text."""
+    if AHOCORASICK_AVAILABLE:
+        emotion_scores = _score_keywords_automaton(text)
+    elif NUMBA_AVAILABLE:
+        emotion_scores = _score_keywords_numba(text)
+    else:
+        emotion_scores = _score_keywords_tokens(text)
+    # Match the _EMOTION_KEYWORDS order so ties in _argmax resolve deterministically
+    return {emotion_key: emotion_scores[emotion_key] for emotion_key in _EMOTION_KEYWORDS if emotion_key in emotion_scores}
+
+def _get_deepface():
+    """Import DeepFace and build its emotion model on first use; None if unavailable."""
+    global _DEEPFACE, _DEEPFACE_ERROR, DEEPFACE_AVAILABLE
+    if _DEEPFACE is None and _DEEPFACE_ERROR is None:
+        with _DEEPFACE_LOCK:
+            # Re-check: another thread may have finished loading while we waited
+            if _DEEPFACE is None and _DEEPFACE_ERROR is None:
+                try:
+                    from deepface import DeepFace
+                    # build_model stores the model in DeepFace's own cache, which analyze() reuses
+                    DeepFace.build_model('Emotion')
+                    _DEEPFACE = DeepFace
+                    DEEPFACE_AVAILABLE = True
+                except ImportError as e:
+                    # Package missing: remember it so later requests don't retry the slow import
+                    _DEEPFACE_ERROR = e
+                    app.logger.warning('DeepFace not available at runtime; skipping facial analysis: %s', e)
+                except Exception as e:
+                    # build_model downloads the weights on first use; a network or disk error
+                    # there may be transient, so leave _DEEPFACE_ERROR unset and retry next request
+                    app.logger.warning('Could not load DeepFace emotion model; will retry: %s', e)
+    return _DEEPFACE
+
+# Set PRELOAD_DEEPFACE=1 to pay the TensorFlow start-up cost at boot instead of on the first image
+if os.getenv('PRELOAD_DEEPFACE'):
+    _get_deepface()
+
+# Optional int8-quantized ONNX export of DeepFace's emotion model (see export_emotion_onnx.py).
+# When present and onnxruntime is installed it replaces DeepFace/TensorFlow for facial analysis.
+EMOTION_ONNX_PATH = os.getenv('EMOTION_ONNX_MODEL', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'emotion_int8.onnx'))
+# Output order of DeepFace's emotion model
+EMOTION_LABELS = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+_ONNX_EMOTION = None
+_ONNX_EMOTION_ERROR = None
+# CascadeClassifier isn't documented as thread-safe; InferenceSession.run is
+_ONNX_LOCK = threading.Lock()
+
+def _get_onnx_emotion():
+    """Load the ONNX emotion model and a Haar face detector once; None if unavailable."""
+    global _ONNX_EMOTION, _ONNX_EMOTION_ERROR
+    if _ONNX_EMOTION is None and _ONNX_EMOTION_ERROR is None:
+        with _ONNX_LOCK:
+            if _ONNX_EMOTION is None and _ONNX_EMOTION_ERROR is None:
+                if not os.path.exists(EMOTION_ONNX_PATH):
+                    _ONNX_EMOTION_ERROR = FileNotFoundError(EMOTION_ONNX_PATH)
+                    return None
+                try:
+                    import onnxruntime as ort
+                    session = ort.InferenceSession(EMOTION_ONNX_PATH, providers=['CPUExecutionProvider'])
+                    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+                    _ONNX_EMOTION = (session, session.get_inputs()[0].name, face_cascade)
+                except Exception as e:
+                    _ONNX_EMOTION_ERROR = e
+                    app.logger.warning('ONNX emotion model not available; using DeepFace: %s', e)
+    return _ONNX_EMOTION
+
+def _analyze_emotion_onnx(model, img):
+    """DeepFace.analyze(actions=['emotion'])-shaped result computed with the ONNX model."""
+    session, input_name, face_cascade = model
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    with _ONNX_LOCK:
+        faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5)
+    if len(faces):
+        # Largest face; like enforce_detection=False, fall back to the whole frame otherwise
+        x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+        gray = gray[y:y + h, x:x + w]
+    face = cv2.resize(gray, (48, 48)).astype(np.float32) / 255.0
+    # Dynamic quantization keeps float inputs; only the weights are int8
+    probs = session.run(None, {input_name: face.reshape(1, 48, 48, 1)})[0][0]
+    emotions = {label: float(100 * p / probs.sum()) for label, p in zip(EMOTION_LABELS, probs)}
+    return {'emotion': emotions, 'dominant_emotion': EMOTION_LABELS[int(np.argmax(probs))]}
+
+# The emotion model only sees a 48x48 face crop, so larger frames just slow down face detection
+MAX_ANALYZE_DIM = 640
+
+# libjpeg can decode straight to 1/2 or 1/4 size by skipping high-frequency coefficients
+_REDUCED_DECODE_FLAGS = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4}
+
+def _jpeg_dimensions(data):
+    """Return (width, height) from a JPEG's SOF header, or None if it can't be found."""
+    i = 2
+    while i + 9 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            i += 1
+            continue
+        # SOF0-SOF15, excluding DHT (C4), JPG (C8) and DAC (CC)
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height = int.from_bytes(data[i + 5:i + 7], 'big')
+            width = int.from_bytes(data[i + 7:i + 9], 'big')
+            return width, height
+        i += 2 + int.from_bytes(data[i + 2:i + 4], 'big')
+    return None
+
+def _jpeg_reduction(image_data):
+    # Largest power-of-two reduction that still leaves the frame at least MAX_ANALYZE_DIM wide
+    dims = _jpeg_dimensions(image_data)
+    if dims is None:
+        return 1
+    for factor in (4, 2):
+        if max(dims) // factor >= MAX_ANALYZE_DIM:
+            return factor
+    return 1
+
+def _decode_image(image_data):
+    """Decode uploaded image bytes to a BGR array, or None if they can't be decoded."""
+    # Webcam captures are JPEG; anything else (or a turbojpeg failure) goes through OpenCV
+    is_jpeg = image_data[:3] == b'\xff\xd8\xff'
+    factor = _jpeg_reduction(image_data) if is_jpeg else 1
+    if _TURBOJPEG is not None and is_jpeg:
+        try:
+            return _TURBOJPEG.decode(image_data, pixel_format=TJPF_BGR, scaling_factor=(1, factor))
+        except Exception as e:
+            app.logger.warning("turbojpeg decode failed, falling back to OpenCV: %s", e)
+    nparr = np.frombuffer(image_data, np.uint8)
+    return cv2.imdecode(nparr, _REDUCED_DECODE_FLAGS[factor])
+
+def _downscale_for_analysis(img):
+    scale = MAX_ANALYZE_DIM / max(img.shape[:2])
+    if scale < 1:
+        img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return img
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
 @app.route('/detect_emotion', methods=['POST'])
 def detect_emotion():
-    # Prefer a robust JSON parse (handles various clients)
-    data = request.get_json(force=True, silent=True) or request.json
-    print(f"[DEBUG] /detect_emotion called with data: {json.dumps(data) if data is not None else 'None'}")
+    # Parse the body exactly once, whatever Content-Type the client sent; cache=False
+    # avoids keeping the raw multi-MB payload around next to the parsed dict
+    try:
+        data = orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        data = None
+    # Log only the keys: the image field can be a multi-MB base64 string
+    if app.logger.isEnabledFor(logging.DEBUG):
+        app.logger.debug("/detect_emotion called with keys=%s", list(data.keys()) if isinstance(data, dict) else None)
+    if not data or not isinstance(data, dict):
+        return jsonify({'error': 'Invalid request. Please send JSON with text or an image.'}), 400
     emotion = None
     detection_method = None
     # Facial emotion detection (try but don't fail if DeepFace missing)
     facial_emotion = None
     facial_confidence = 0.0
     if 'image' in data:
-        # Lazy import DeepFace to avoid heavy imports at startup
-        use_deepface = False
-        try:
-            from deepface import DeepFace
-            use_deepface = True
-        except Exception as e:
-            print('DeepFace not available at runtime; skipping facial analysis:', e)
+        # Prefer the quantized ONNX model; lazy import DeepFace only when it isn't available
+        onnx_model = _get_onnx_emotion()
+        DeepFace = _get_deepface() if onnx_model is None else None
 
-        if use_deepface:
+        if onnx_model is not None or DeepFace is not None:
             try:
-                image_data = base64.b64decode(data['image'].split(',')[1])
-                nparr = np.frombuffer(image_data, np.uint8)
-                img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+                # Strip the 'data:image/jpeg;base64,' prefix by slicing once rather than split()ting the payload
+                image_b64 = data['image']
+                comma = image_b64.find(',')
+                image_data = binascii.a2b_base64(image_b64[comma + 1:] if comma != -1 else image_b64)
+                img = _decode_image(image_data)
                 
                 if img is None:
-                    print("Error: Could not decode image")
+                    app.logger.error("Could not decode image")
                 else:
-                    result = DeepFace.analyze(img, actions=['emotion'], enforce_detection=False)
+                    img = _downscale_for_analysis(img)
+                    if onnx_model is not None:
+                        result = _analyze_emotion_onnx(onnx_model, img)
+                    else:
+                        with _DEEPFACE_LOCK:
+                            result = DeepFace.analyze(img, actions=['emotion'], enforce_detection=False, detector_backend='opencv')
                     # result can be a list or dict
                     if isinstance(result, list):
                         res = result[0]
@@ -84,21 +454,22 @@ def detect_emotion():
                     # DeepFace returns an 'emotion' dict with scores and 'dominant_emotion'
                     emotions_dict = res.get('emotion') if isinstance(res, dict) else None
                     if emotions_dict:
-                        facial_emotion = max(emotions_dict, key=emotions_dict.get)
-                        facial_confidence = float(emotions_dict.get(facial_emotion, 0.0)) / 100.0 if max(emotions_dict.values()) > 1.0 else float(emotions_dict.get(facial_emotion, 0.0))
+                        facial_emotion, top_score = max(emotions_dict.items(), key=itemgetter(1))
+                        # DeepFace reports percentages; normalize to 0-1 when needed
+                        facial_confidence = float(top_score) / 100.0 if top_score > 1.0 else float(top_score)
                     else:
                         # Fallback to dominant_emotion
                         facial_emotion = res.get('dominant_emotion') if isinstance(res, dict) else None
                         facial_confidence = 0.0
                     detection_method = 'facial'
             except Exception as e:
-                print(f"Error in facial emotion detection: {e}")
+                app.logger.error("Error in facial emotion detection: %s", e)
                 facial_emotion = None
                 facial_confidence = 0.0
         else:
             # DeepFace not available at runtime — log and continue with text detection if present
-            print('Received image but DeepFace not available; skipping facial analysis.')
-    print(f"[DEBUG] facial_emotion={facial_emotion}, facial_confidence={facial_confidence}")
+            app.logger.warning('Received image but DeepFace not available; skipping facial analysis.')
+    app.logger.debug("facial_emotion=%s, facial_confidence=%s", facial_emotion, facial_confidence)
 
     # Text emotion detection
     text_emotion = None
@@ -107,72 +478,65 @@ def detect_emotion():
         try:
             text = data['text'].lower().strip()
             
-            # Enhanced keyword-based emotion detection (English + Hindi keywords)
-            emotion_keywords = {
-                'happy': ['happy', 'joy', 'excited', 'great', 'wonderful', 'amazing', 'fantastic', 'love', 'glad', 'cheerful', 'delighted', 'thrilled', 'excellent', 'good', 'awesome', 'perfect', 'खुश', 'खुशी', 'खुश हूँ', 'मज़ा', 'उत्साहित'],
-                'sad': ['sad', 'unhappy', 'depressed', 'lonely', 'miserable', 'down', 'blue', 'disappointed', 'upset', 'hurt', 'heartbroken', 'crying', 'tears', 'awful', 'terrible', 'bad', 'उदास', 'दुख', 'टूट', 'दुखी'],
-                'angry': ['angry', 'mad', 'furious', 'irritated', 'annoyed', 'frustrated', 'rage', 'pissed', 'hate', 'disgusted', 'outraged', 'गुस्सा', 'क्रोधित', 'नाराज़'],
-                'fear': ['scared', 'afraid', 'fear', 'anxious', 'worried', 'nervous', 'terrified', 'frightened', 'panic', 'डर', 'घबराहट', 'डरा'],
-                'surprise': ['surprised', 'shocked', 'amazed', 'astonished', 'wow', 'incredible', 'unbelievable', 'हैरान', 'चकित'],
-                'neutral': ['okay', 'fine', 'alright', 'normal', 'meh', 'whatever', 'ठीक', 'अच्छा', 'सामान्य']
-            }
-
             # Count keyword matches
-            emotion_scores = {}
-            for emotion_key, keywords in emotion_keywords.items():
-                score = sum(1 for keyword in keywords if keyword in text)
-                if score > 0:
-                    emotion_scores[emotion_key] = score
+            emotion_scores = score_keywords(text)
 
             # Detect if text contains Devanagari characters -> treat as Hindi
-            is_hindi = bool(re.search(r'[\u0900-\u097F]', text))
+            is_hindi = bool(_HINDI_RE.search(text))
             language = 'hi' if is_hindi else 'en'
 
             if is_hindi:
                 # For Hindi, rely on keyword matching only (text2emotion is English-only)
                 if emotion_scores:
-                    text_emotion = max(emotion_scores, key=emotion_scores.get)
+                    text_emotion = _argmax(emotion_scores)
                     text_confidence = float(min(emotion_scores[text_emotion] / 5.0, 1.0))
                     detection_method = 'text'
                 else:
                     return jsonify({'error': 'Could not detect emotion from text. Please provide more descriptive text about your feelings.'}), 400
             else:
-                # Try text2emotion first for English text
-                text_emotions = te.get_emotion(data['text'])
-
-                # Combine both methods
-                if text_emotions and any(text_emotions.values()):
-                    te_emotion = max(text_emotions, key=text_emotions.get)
-                    te_score = text_emotions[te_emotion]
-                    if emotion_scores:
-                        keyword_emotion = max(emotion_scores, key=emotion_scores.get)
-                        keyword_score = emotion_scores[keyword_emotion]
-                        if keyword_score >= 2 or (keyword_score > 0 and te_score < 0.3):
-                            text_emotion = keyword_emotion
-                            text_confidence = float(min(keyword_score / 5.0, 1.0))
+                keyword_emotion = _argmax(emotion_scores) if emotion_scores else None
+                keyword_score = emotion_scores[keyword_emotion] if emotion_scores else 0
+                if keyword_score >= DECISIVE_KEYWORD_SCORE:
+                    # Keywords win the combination below at this score anyway, so skip text2emotion's NLTK pass
+                    text_emotion = keyword_emotion
+                    text_confidence = float(min(keyword_score / 5.0, 1.0))
+                    detection_method = 'text'
+                else:
+                    # Try text2emotion first for English text
+                    text_emotions = dict(_cached_text_emotion(data['text']))
+
+                    # Combine both methods
+                    if text_emotions and any(text_emotions.values()):
+                        te_emotion = _argmax(text_emotions)
+                        te_score = text_emotions[te_emotion]
+                        if emotion_scores:
+                            # Weaker keyword evidence still wins when text2emotion is unsure
+                            if te_score < 0.3:
+                                text_emotion = keyword_emotion
+                                text_confidence = float(min(keyword_score / 5.0, 1.0))
+                            else:
+                                text_emotion = te_emotion
+                                text_confidence = float(te_score)
                         else:
                             text_emotion = te_emotion
                             text_confidence = float(te_score)
+                        detection_method = 'text'
+                    elif emotion_scores:
+                        text_emotion = keyword_emotion
+                        text_confidence = float(min(keyword_score / 5.0, 1.0))
+                        detection_method = 'text'
                     else:
-                        text_emotion = te_emotion
-                        text_confidence = float(te_score)
-                    detection_method = 'text'
-                elif emotion_scores:
-                    text_emotion = max(emotion_scores, key=emotion_scores.get)
-                    text_confidence = float(min(emotion_scores[text_emotion] / 5.0, 1.0))
-                    detection_method = 'text'
-                else:
-                    return jsonify({'error': 'Could not detect emotion from text. Please provide more descriptive text about your feelings.'}), 400
+                        return jsonify({'error': 'Could not detect emotion from text. Please provide more descriptive text about your feelings.'}), 400
         except Exception as e:
             import traceback
             tb = traceback.format_exc()
-            print(f"Error in text emotion detection: {e}\n{tb}")
+            app.logger.error("Error in text emotion detection: %s\n%s", e, tb)
             # Return exception details in response for local debugging
             return jsonify({'error': 'Text analysis failed. Please try again.', 'exception': str(e), 'trace': tb}), 400
     else:
-        print('[DEBUG] No text provided or text empty')
+        app.logger.debug('No text provided or text empty')
 
-    print(f"[DEBUG] text_emotion={text_emotion}, text_confidence={text_confidence}")
+    app.logger.debug("text_emotion=%s, text_confidence=%s", text_emotion, text_confidence)
 
     # Combine facial and text detections if both available
     final_emotion = None
@@ -200,15 +564,16 @@ def detect_emotion():
         final_method = 'text'
 
     if final_emotion:
-        emotion_lower = final_emotion.lower()
-        mood = emotion_to_mood.get(emotion_lower, 'chill')
+        # Labels are lower-case at detection time (DeepFace, keywords and _cached_text_emotion)
+        mood = emotion_to_mood.get(final_emotion, 'chill')
         playlists = get_spotify_playlists(mood, language)
 
         # Debug logging
-        print(f"Detected emotion (final): {final_emotion} -> Mood: {mood} (method={final_method}, confidence={confidence}, language={language})")
+        app.logger.info("Detected emotion (final): %s -> Mood: %s (method=%s, confidence=%s, language=%s)",
+                        final_emotion, mood, final_method, confidence, language)
 
         return jsonify({
-            'emotion': emotion_lower,
+            'emotion': final_emotion,
             'mood': mood,
             'language': language,
             'playlists': playlists,
@@ -220,102 +585,155 @@ def detect_emotion():
             'text_confidence': text_confidence
         })
     else:
-        print('[DEBUG] final_emotion is None - returning 400')
+        app.logger.debug('final_emotion is None - returning 400')
         return jsonify({'error': 'Could not detect emotion. Please try again with clearer input.'}), 400
 
+# Sample playlists returned when the Spotify API is not configured
+_SAMPLE_PLAYLISTS_HI = MappingProxyType({
+    'happy': (
+        {'name': 'Bollywood Happy Hits', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX2taZN6Kf4K1', 'image': 'https://via.placeholder.com/300x300/FFD700/000000?text=Bollywood+Happy'},
+        {'name': 'Top Bollywood', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DXcZ6X5YK6xG6', 'image': 'https://via.placeholder.com/300x300/FF6B9D/000000?text=Top+Bollywood'},
+        {'name': 'Bollywood Retro', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX2yvmlOdMYzV', 'image': 'https://via.placeholder.com/300x300/00D4FF/000000?text=Bollywood+Retro'}
+    ),
+    'sad': (
+        {'name': 'Bollywood Sad', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DWSf2RDTDayIx', 'image': 'https://via.placeholder.com/300x300/4169E1/FFFFFF?text=Bollywood+Sad'},
+        {'name': 'Sad Bollywood', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX7qK8ma5wgG1', 'image': 'https://via.placeholder.com/300x300/708090/FFFFFF?text=Sad+Bollywood'},
+        {'name': 'Melancholic Bollywood', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DWX83CujKHHOn', 'image': 'https://via.placeholder.com/300x300/2F4F4F/FFFFFF?text=Melancholy+Bollywood'}
+    ),
+    'chill': (
+        {'name': 'Bollywood Mellow', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX889U0CL85jj', 'image': 'https://via.placeholder.com/300x300/9370DB/000000?text=Bollywood+Chill'},
+        {'name': 'Indie Hindi Chill', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DWWQRwui0ExPn', 'image': 'https://via.placeholder.com/300x300/BA55D3/000000?text=Indie+Hindi'},
+        {'name': 'Romantic Bollywood', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX50QitC6Oqtn', 'image': 'https://via.placeholder.com/300x300/FF1493/FFFFFF?text=Romantic+Bollywood'}
+    )
+})
+
+_SAMPLE_PLAYLISTS = MappingProxyType({
+    'happy': (
+        {'name': 'Happy Hits', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DXdPec7aLTmlC', 'image': 'https://via.placeholder.com/300x300/FFD700/000000?text=Happy+Hits'},
+        {'name': 'Feel Good Indie', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX2sUQwD7tbmL', 'image': 'https://via.placeholder.com/300x300/FF6B9D/000000?text=Feel+Good'},
+        {'name': 'Mood Booster', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX3rxVfibe1L0', 'image': 'https://via.placeholder.com/300x300/00D4FF/000000?text=Mood+Booster'}
+    ),
+    'sad': (
+        {'name': 'Life Sucks', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX7qK8ma5wgG1', 'image': 'https://via.placeholder.com/300x300/4169E1/FFFFFF?text=Sad+Songs'},
+        {'name': 'Sad Indie', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX59NCqCqJtoH', 'image': 'https://via.placeholder.com/300x300/708090/FFFFFF?text=Sad+Indie'},
+        {'name': 'Melancholy', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DWX83CujKHHOn', 'image': 'https://via.placeholder.com/300x300/2F4F4F/FFFFFF?text=Melancholy'}
+    ),
+    'energetic': (
+        {'name': 'Beast Mode', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX76Wlfdnj7AP', 'image': 'https://via.placeholder.com/300x300/FF4500/000000?text=Beast+Mode'},
+        {'name': 'Power Workout', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX70RN3TfWWJh', 'image': 'https://via.placeholder.com/300x300/DC143C/000000?text=Power+Workout'},
+        {'name': 'Adrenaline', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX0pH2SQMRXnC', 'image': 'https://via.placeholder.com/300x300/8B0000/FFFFFF?text=Adrenaline'}
+    ),
+    'calm': (
+        {'name': 'Peaceful Piano', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX4sWSpwq3LiO', 'image': 'https://via.placeholder.com/300x300/87CEEB/000000?text=Peaceful+Piano'},
+        {'name': 'Calm Vibes', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DWU0ScTcjJBdj', 'image': 'https://via.placeholder.com/300x300/ADD8E6/000000?text=Calm+Vibes'},
+        {'name': 'Relaxing Sounds', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DWZd79rJ6a7lp', 'image': 'https://via.placeholder.com/300x300/B0E0E6/000000?text=Relaxing'}
+    ),
+    'excited': (
+        {'name': 'Party Time', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DXaXB8fQg7xif', 'image': 'https://via.placeholder.com/300x300/FF1493/000000?text=Party+Time'},
+        {'name': 'Dance Party', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX4dyzvuaRJ0n', 'image': 'https://via.placeholder.com/300x300/FF69B4/000000?text=Dance+Party'},
+        {'name': 'Energy Boost', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX3Sp0P28SIer', 'image': 'https://via.placeholder.com/300x300/FFB6C1/000000?text=Energy+Boost'}
+    ),
+    'chill': (
+        {'name': 'Chill Hits', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX4WYpdgoIcn6', 'image': 'https://via.placeholder.com/300x300/9370DB/000000?text=Chill+Hits'},
+        {'name': 'Lofi Beats', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DWWQRwui0ExPn', 'image': 'https://via.placeholder.com/300x300/BA55D3/000000?text=Lofi+Beats'},
+        {'name': 'Chill Vibes', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX889U0CL85jj', 'image': 'https://via.placeholder.com/300x300/DDA0DD/000000?text=Chill+Vibes'}
+    ),
+    'romantic': (
+        {'name': 'Romantic', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX50QitC6Oqtn', 'image': 'https://via.placeholder.com/300x300/FF1493/FFFFFF?text=Romantic'},
+        {'name': 'Love Songs', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX0UrRvztWcAU', 'image': 'https://via.placeholder.com/300x300/FF69B4/FFFFFF?text=Love+Songs'},
+        {'name': 'Date Night', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX4OzrY981I1W', 'image': 'https://via.placeholder.com/300x300/FFB6C1/000000?text=Date+Night'}
+    ),
+    'dark': (
+        {'name': 'Dark & Stormy', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX0XUfTFmNBRM', 'image': 'https://via.placeholder.com/300x300/2F4F4F/FFFFFF?text=Dark'},
+        {'name': 'Metal', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DWWOaP4H0w5b0', 'image': 'https://via.placeholder.com/300x300/000000/FFFFFF?text=Metal'},
+        {'name': 'Rock Hard', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DWXRqgorJj26U', 'image': 'https://via.placeholder.com/300x300/1C1C1C/FFFFFF?text=Rock+Hard'}
+    )
+})
+
 def get_spotify_playlists(mood, language='en'):
     if sp is None:
         # Return sample playlists when Spotify API is not configured
-        if language == 'hi':
-            sample_playlists_hi = {
-                'happy': [
-                    {'name': 'Bollywood Happy Hits', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX2taZN6Kf4K1', 'image': 'https://via.placeholder.com/300x300/FFD700/000000?text=Bollywood+Happy'},
-                    {'name': 'Top Bollywood', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DXcZ6X5YK6xG6', 'image': 'https://via.placeholder.com/300x300/FF6B9D/000000?text=Top+Bollywood'},
-                    {'name': 'Bollywood Retro', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX2yvmlOdMYzV', 'image': 'https://via.placeholder.com/300x300/00D4FF/000000?text=Bollywood+Retro'}
-                ],
-                'sad': [
-                    {'name': 'Bollywood Sad', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DWSf2RDTDayIx', 'image': 'https://via.placeholder.com/300x300/4169E1/FFFFFF?text=Bollywood+Sad'},
-                    {'name': 'Sad Bollywood', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX7qK8ma5wgG1', 'image': 'https://via.placeholder.com/300x300/708090/FFFFFF?text=Sad+Bollywood'},
-                    {'name': 'Melancholic Bollywood', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DWX83CujKHHOn', 'image': 'https://via.placeholder.com/300x300/2F4F4F/FFFFFF?text=Melancholy+Bollywood'}
-                ],
-                'chill': [
-                    {'name': 'Bollywood Mellow', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX889U0CL85jj', 'image': 'https://via.placeholder.com/300x300/9370DB/000000?text=Bollywood+Chill'},
-                    {'name': 'Indie Hindi Chill', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DWWQRwui0ExPn', 'image': 'https://via.placeholder.com/300x300/BA55D3/000000?text=Indie+Hindi'},
-                    {'name': 'Romantic Bollywood', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX50QitC6Oqtn', 'image': 'https://via.placeholder.com/300x300/FF1493/FFFFFF?text=Romantic+Bollywood'}
-                ]
-            }
-            return sample_playlists_hi.get(mood, sample_playlists_hi['chill'])
-        else:
-            sample_playlists = {
-                'happy': [
-                    {'name': 'Happy Hits', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DXdPec7aLTmlC', 'image': 'https://via.placeholder.com/300x300/FFD700/000000?text=Happy+Hits'},
-                    {'name': 'Feel Good Indie', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX2sUQwD7tbmL', 'image': 'https://via.placeholder.com/300x300/FF6B9D/000000?text=Feel+Good'},
-                    {'name': 'Mood Booster', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX3rxVfibe1L0', 'image': 'https://via.placeholder.com/300x300/00D4FF/000000?text=Mood+Booster'}
-                ],
-                'sad': [
-                    {'name': 'Life Sucks', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX7qK8ma5wgG1', 'image': 'https://via.placeholder.com/300x300/4169E1/FFFFFF?text=Sad+Songs'},
-                    {'name': 'Sad Indie', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX59NCqCqJtoH', 'image': 'https://via.placeholder.com/300x300/708090/FFFFFF?text=Sad+Indie'},
-                    {'name': 'Melancholy', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DWX83CujKHHOn', 'image': 'https://via.placeholder.com/300x300/2F4F4F/FFFFFF?text=Melancholy'}
-                ],
-                'energetic': [
-                    {'name': 'Beast Mode', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX76Wlfdnj7AP', 'image': 'https://via.placeholder.com/300x300/FF4500/000000?text=Beast+Mode'},
-                    {'name': 'Power Workout', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX70RN3TfWWJh', 'image': 'https://via.placeholder.com/300x300/DC143C/000000?text=Power+Workout'},
-                    {'name': 'Adrenaline', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX0pH2SQMRXnC', 'image': 'https://via.placeholder.com/300x300/8B0000/FFFFFF?text=Adrenaline'}
-                ],
-                'calm': [
-                    {'name': 'Peaceful Piano', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX4sWSpwq3LiO', 'image': 'https://via.placeholder.com/300x300/87CEEB/000000?text=Peaceful+Piano'},
-                    {'name': 'Calm Vibes', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DWU0ScTcjJBdj', 'image': 'https://via.placeholder.com/300x300/ADD8E6/000000?text=Calm+Vibes'},
-                    {'name': 'Relaxing Sounds', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DWZd79rJ6a7lp', 'image': 'https://via.placeholder.com/300x300/B0E0E6/000000?text=Relaxing'}
-                ],
-                'excited': [
-                    {'name': 'Party Time', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DXaXB8fQg7xif', 'image': 'https://via.placeholder.com/300x300/FF1493/000000?text=Party+Time'},
-                    {'name': 'Dance Party', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX4dyzvuaRJ0n', 'image': 'https://via.placeholder.com/300x300/FF69B4/000000?text=Dance+Party'},
-                    {'name': 'Energy Boost', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX3Sp0P28SIer', 'image': 'https://via.placeholder.com/300x300/FFB6C1/000000?text=Energy+Boost'}
-                ],
-                'chill': [
-                    {'name': 'Chill Hits', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX4WYpdgoIcn6', 'image': 'https://via.placeholder.com/300x300/9370DB/000000?text=Chill+Hits'},
-                    {'name': 'Lofi Beats', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DWWQRwui0ExPn', 'image': 'https://via.placeholder.com/300x300/BA55D3/000000?text=Lofi+Beats'},
-                    {'name': 'Chill Vibes', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX889U0CL85jj', 'image': 'https://via.placeholder.com/300x300/DDA0DD/000000?text=Chill+Vibes'}
-                ],
-                'romantic': [
-                    {'name': 'Romantic', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX50QitC6Oqtn', 'image': 'https://via.placeholder.com/300x300/FF1493/FFFFFF?text=Romantic'},
-                    {'name': 'Love Songs', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX0UrRvztWcAU', 'image': 'https://via.placeholder.com/300x300/FF69B4/FFFFFF?text=Love+Songs'},
-                    {'name': 'Date Night', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX4OzrY981I1W', 'image': 'https://via.placeholder.com/300x300/FFB6C1/000000?text=Date+Night'}
-                ],
-                'dark': [
-                    {'name': 'Dark & Stormy', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DX0XUfTFmNBRM', 'image': 'https://via.placeholder.com/300x300/2F4F4F/FFFFFF?text=Dark'},
-                    {'name': 'Metal', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DWWOaP4H0w5b0', 'image': 'https://via.placeholder.com/300x300/000000/FFFFFF?text=Metal'},
-                    {'name': 'Rock Hard', 'url': 'https://open.spotify.com/playlist/37i9dQZF1DWXRqgorJj26U', 'image': 'https://via.placeholder.com/300x300/1C1C1C/FFFFFF?text=Rock+Hard'}
-                ]
-            }
-            return sample_playlists.get(mood, sample_playlists['chill'])
-    
+        samples = _SAMPLE_PLAYLISTS_HI if language == 'hi' else _SAMPLE_PLAYLISTS
+        return [dict(playlist) for playlist in samples.get(mood, samples['chill'])]
+
     try:
-        # Enhanced search queries for better results
-        search_queries = {
-            'happy': ['happy', 'feel good', 'uplifting'],
-            'sad': ['sad', 'melancholy', 'emotional'],
-            'energetic': ['workout', 'energetic', 'power'],
-            'calm': ['calm', 'peaceful', 'relaxing'],
-            'excited': ['party', 'dance', 'upbeat'],
-            'chill': ['chill', 'lofi', 'relax'],
-            'romantic': ['romantic', 'love songs', 'date night'],
-            'dark': ['dark', 'intense', 'heavy']
-        }
-        
-        query = search_queries.get(mood, [mood])[0]
-        results = sp.search(q=query, type='playlist', limit=5)
-        playlists = []
-        for item in results['playlists']['items']:
+        # Cached results are shared between requests, so hand out copies
+        _fetched_at, playlists = _search_spotify_playlists(mood)
+        return [dict(playlist) for playlist in playlists]
+    except Exception as e:
+        app.logger.error("Error fetching Spotify playlists: %s", e)
+        return []
+
+@cached(_PLAYLIST_CACHE, lock=threading.Lock())
+def _search_spotify_playlists(mood):
+    # Errors propagate to the caller so failed lookups are not cached
+    stored = _load_stored_playlists(mood)
+    if stored is not None:
+        return stored
+    fetched_at = int(time.time())
+    playlists = _fetch_spotify_playlists(mood)
+    _store_playlists(mood, fetched_at, playlists)
+    return fetched_at, playlists
+
+# Enhanced search queries for better results
+_SEARCH_QUERIES = MappingProxyType({
+    'happy': ('happy', 'feel good', 'uplifting'),
+    'sad': ('sad', 'melancholy', 'emotional'),
+    'energetic': ('workout', 'energetic', 'power'),
+    'calm': ('calm', 'peaceful', 'relaxing'),
+    'excited': ('party', 'dance', 'upbeat'),
+    'chill': ('chill', 'lofi', 'relax'),
+    'romantic': ('romantic', 'love songs', 'date night'),
+    'dark': ('dark', 'intense', 'heavy')
+})
+
+PLAYLISTS_PER_QUERY = 5
+# Spotify caps a single search page at 50 items
+_SPOTIFY_PAGE_LIMIT = 50
+
+def _search_playlist_items(query, total_target=PLAYLISTS_PER_QUERY):
+    """Collect up to total_target playlist items for query, following Spotify's paging cursor."""
+    page = sp.search(q=query, type='playlist', limit=min(total_target, _SPOTIFY_PAGE_LIMIT))['playlists']
+    items = []
+    while True:
+        # Spotify occasionally returns null entries in search results
+        items.extend(item for item in page['items'] if item)
+        if len(items) >= total_target or not page['items'] or not page.get('next'):
+            break
+        page = sp.next(page)['playlists']
+    return items[:total_target]
+
+def _search_playlist_items_safe(query):
+    # Returns (items, error) so one failed query doesn't discard the others' results
+    try:
+        return _search_playlist_items(query), None
+    except Exception as e:
+        app.logger.warning("Spotify search for %r failed: %s", query, e)
+        return [], e
+
+def _fetch_spotify_playlists(mood):
+    queries = _SEARCH_QUERIES.get(mood, (mood,))
+    # Issue every query at once; total wait is the slowest search rather than the sum
+    results = list(_SPOTIFY_POOL.map(_search_playlist_items_safe, queries))
+    errors = [error for _items, error in results if error is not None]
+    if len(errors) == len(results):
+        # Nothing succeeded: raise so the failure isn't cached
+        raise errors[-1]
+    playlists = []
+    seen_urls = set()
+    for items, _error in results:
+        for item in items:
+            url = item['external_urls']['spotify']
+            if url in seen_urls:
+                continue
+            seen_urls.add(url)
             playlists.append({
                 'name': item['name'],
-                'url': item['external_urls']['spotify'],
+                'url': url,
                 'image': item['images'][0]['url'] if item['images'] else None
             })
-        return playlists
-    except Exception as e:
-        print(f"Error fetching Spotify playlists: {e}")
-        return []
+    return playlists
 
+# Development server only; in production run under gunicorn (see Procfile)
 if __name__ == '__main__':
-    app.run(debug=True)
+    app.run(debug=os.getenv('FLASK_DEBUG', '1') == '1')
@@ -0,0 +1,26 @@
+"""One-time export of DeepFace's emotion model to an int8-quantized ONNX file.
+
+app.py picks up emotion_int8.onnx automatically when onnxruntime is installed.
+
+Usage:
+    pip install tf2onnx onnxruntime
+    python export_emotion_onnx.py
+"""
+import os
+
+import tensorflow as tf
+import tf2onnx
+from deepface import DeepFace
+from onnxruntime.quantization import QuantType, quantize_dynamic
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+FP32_PATH = os.path.join(APP_DIR, 'emotion.onnx')
+INT8_PATH = os.path.join(APP_DIR, 'emotion_int8.onnx')
+
+if __name__ == '__main__':
+    model = DeepFace.build_model('Emotion')
+    # 48x48 grayscale face crops scaled to [0, 1], as DeepFace feeds the model
+    spec = (tf.TensorSpec((None, 48, 48, 1), tf.float32, name='input'),)
+    tf2onnx.convert.from_keras(model, input_signature=spec, output_path=FP32_PATH)
+    quantize_dynamic(FP32_PATH, INT8_PATH, weight_type=QuantType.QInt8)
+    print(f"Wrote {INT8_PATH}")